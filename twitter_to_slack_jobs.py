@@ -5,20 +5,151 @@ Fetches job postings from Twitter/X and posts them to a Slack channel
 """
 
 import os
+import re
 import json
-import tweepy
-import requests
+import asyncio
+import aiohttp
+import orjson
+from dataclasses import dataclass
+from functools import lru_cache
+from tweepy.asynchronous import AsyncClient
 from datetime import datetime, timedelta
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Tuple, Iterable, Optional
 import time
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file, unless they were all already injected
+if not all(os.getenv(k) for k in ('TWITTER_BEARER_TOKEN', 'SLACK_WEBHOOK_URL')):
+    load_dotenv()
+
+# Slack incoming webhooks allow roughly one message per second
+SLACK_POST_INTERVAL = 1.0
+SLACK_MAX_CONCURRENCY = 4
+
+# Default headers for the Slack session, so individual posts don't pass any
+SLACK_HEADERS = {'Content-Type': 'application/json'}
+
+# Tweets per Slack message; each tweet takes 2 of Slack's 50 blocks per message
+SLACK_BATCH_SIZE = 8
+
+# Pre-serialized Slack blocks for one tweet; only the JSON-escaped {text} and {url} change
+_SLACK_BLOCKS_TEMPLATE = json.dumps([
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "{text}\n\n{url}"
+        }
+    },
+    {
+        "type": "divider"
+    }
+])[1:-1].replace('{', '{{').replace('}', '}}').replace('{{text}}', '{text}').replace('{{url}}', '{url}')
+
+
+@dataclass(slots=True)
+class Tweet:
+    """A job tweet fetched from Twitter, with derived fields used downstream"""
+    id: int
+    text: str
+    text_lower: str
+    created_at: datetime
+    author_name: str
+    author_username: str
+    url: Optional[str]
+    likes: int
+    retweets: int
+
+
+def _json_escape(value: str) -> str:
+    """Escape a string for interpolation inside a JSON string literal"""
+    try:
+        return orjson.dumps(value)[1:-1].decode('utf-8')
+    except TypeError:
+        # orjson rejects strings that aren't valid UTF-8 (e.g. unpaired surrogates)
+        return json.dumps(value)[1:-1]
+
+
+def _build_blocks(tweet: Tweet) -> str:
+    """Render the serialized Slack blocks for a single tweet"""
+    return _SLACK_BLOCKS_TEMPLATE.format(
+        text=_json_escape(tweet.text),
+        url=_json_escape(str(tweet.url))
+    )
+
+
+# Nigeria-specific keywords that MUST be present in a relevant tweet
+NIGERIA_KEYWORDS = [
+    'nigeria', 'nigerian', 'lagos', 'abuja', 'port harcourt',
+    'ibadan', 'kano', 'benin city', 'enugu', 'kaduna'
+]
+
+
+@lru_cache(maxsize=None)
+def dedupe_keywords(keywords: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Lowercase keywords and drop redundant entries
+    
+    A keyword that contains another keyword can never change the outcome of a
+    substring match (e.g. 'devops engineer' is covered by 'devops'), so only the
+    shortest form is kept.
+    
+    Args:
+        keywords: Keywords to deduplicate
+    
+    Returns:
+        Tuple of unique lowercased keywords in their original order
+    """
+    unique = list(dict.fromkeys(k.lower() for k in keywords))
+    return tuple(k for k in unique if not any(other != k and other in k for other in unique))
+
+
+@lru_cache(maxsize=None)
+def compile_keywords(keywords: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    Compile keywords into a single matcher for lowercased text
+    
+    Args:
+        keywords: Keywords to match anywhere in the text
+    
+    Returns:
+        Compiled pattern, or None if there are no keywords
+    """
+    escaped = sorted({re.escape(k.lower()) for k in keywords}, key=len, reverse=True)
+    if not escaped:
+        return None
+    return re.compile('|'.join(escaped))
+
+
+NIGERIA_PATTERN = compile_keywords(tuple(NIGERIA_KEYWORDS))
+
+
+class RateLimiter:
+    """Limiter that spaces coroutine calls at least `interval` seconds apart"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next_slot = 0.0
+    
+    async def wait(self):
+        """Sleep until the caller's slot comes up"""
+        # Slots are claimed without awaiting, so no lock is needed on the event loop
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
 
 class TwitterJobBot:
-    def __init__(self):
-        """Initialize the bot with API credentials from environment variables"""
+    def __init__(self, filter_config: Optional[Dict] = None):
+        """
+        Initialize the bot with API credentials from environment variables
+        
+        Args:
+            filter_config: Optional filter configuration with 'include' and 'exclude' lists
+        """
         # Twitter/X API credentials
         self.api_key = os.getenv('TWITTER_API_KEY')
         self.api_secret = os.getenv('TWITTER_API_SECRET')
@@ -27,32 +158,68 @@ class TwitterJobBot:
         # Slack webhook URL
         self.slack_webhook = os.getenv('SLACK_WEBHOOK_URL')
         
-        # Storage file for posted job IDs
-        self.posted_jobs_file = 'posted_jobs.json'
+        # Append-only storage file for posted job IDs (one ID per line)
+        self.posted_jobs_file = 'posted_jobs.log'
+        self.legacy_posted_jobs_file = 'posted_jobs.json'
         
         # Initialize Twitter client
-        self.client = tweepy.Client(bearer_token=self.bearer_token)
+        self.client = AsyncClient(bearer_token=self.bearer_token)
         
-        # Load previously posted jobs
+        # Slack HTTP session, opened inside the event loop by run()
+        self.http = None
+        self.slack_limiter = RateLimiter(SLACK_POST_INTERVAL)
+        
+        # Lowercased keywords and compiled patterns, built once per filter config
+        self._include_lc = ()
+        self._exclude_lc = ()
+        self._include_pattern = None
+        self._exclude_pattern = None
+        if filter_config is not None:
+            self.set_filters(filter_config)
+        
+        # Load previously posted jobs; run() opens the log for appends
         self.posted_jobs = self._load_posted_jobs()
+        self._posted_fp = None
     
-    def _load_posted_jobs(self) -> Set[str]:
+    def _load_posted_jobs(self) -> Set[int]:
         """Load previously posted job IDs from file"""
         if os.path.exists(self.posted_jobs_file):
             with open(self.posted_jobs_file, 'r') as f:
-                data = json.load(f)
-                return set(data.get('posted_ids', []))
+                return set(int(line) for line in f if line.strip())
+        
+        # Migrate IDs from the old JSON storage into the log
+        if os.path.exists(self.legacy_posted_jobs_file):
+            with open(self.legacy_posted_jobs_file, 'rb') as f:
+                posted_ids = set(int(x) for x in orjson.loads(f.read()).get('posted_ids', []))
+            with open(self.posted_jobs_file, 'w') as f:
+                f.writelines(f"{posted_id}\n" for posted_id in posted_ids)
+            return posted_ids
         return set()
     
-    def _save_posted_jobs(self):
-        """Save posted job IDs to file"""
-        with open(self.posted_jobs_file, 'w') as f:
-            json.dump({
-                'posted_ids': list(self.posted_jobs),
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2)
+    def _record_posted_jobs(self, tweet_ids: Iterable[int]):
+        """Remember posted job IDs and append them to the log in a single write"""
+        tweet_ids = [int(tweet_id) for tweet_id in tweet_ids]
+        self.posted_jobs.update(tweet_ids)
+        self._posted_fp.write(''.join(f"{tweet_id}\n" for tweet_id in tweet_ids))
+        self._posted_fp.flush()
+    
+    def set_filters(self, filter_config: Dict):
+        """
+        Prepare the include/exclude keyword matchers
+        
+        Args:
+            filter_config: Dictionary with 'include' and 'exclude' keyword lists
+        """
+        include = filter_config.get('include', [])
+        exclude = filter_config.get('exclude', [])
+        self._include_lc = dedupe_keywords(tuple(include))
+        self._exclude_lc = dedupe_keywords(tuple(exclude))
+        print(f"🧹 Filter keywords: {len(include)} → {len(self._include_lc)} include, "
+              f"{len(exclude)} → {len(self._exclude_lc)} exclude")
+        self._include_pattern = compile_keywords(self._include_lc)
+        self._exclude_pattern = compile_keywords(self._exclude_lc)
     
-    def search_jobs(self, keywords: List[str], max_results: int = 20) -> List[Dict]:
+    async def search_jobs(self, keywords: List[str], max_results: int = 20) -> List[Tweet]:
         """
         Search Twitter for job postings
         
@@ -61,14 +228,14 @@ class TwitterJobBot:
             max_results: Maximum number of results to return
         
         Returns:
-            List of tweet dictionaries
+            List of tweets
         """
         # Build search query
         query = ' OR '.join(keywords)
         
         # Search for tweets from the last 24 hours
         try:
-            tweets = self.client.search_recent_tweets(
+            tweets = await self.client.search_recent_tweets(
                 query=query,
                 max_results=max_results,
                 tweet_fields=['created_at', 'author_id', 'public_metrics', 'entities'],
@@ -89,20 +256,21 @@ class TwitterJobBot:
             results = []
             for tweet in tweets.data:
                 # Skip if already posted
-                if tweet.id in self.posted_jobs:
+                if int(tweet.id) in self.posted_jobs:
                     continue
                 
                 author = users.get(tweet.author_id)
-                results.append({
-                    'id': tweet.id,
-                    'text': tweet.text,
-                    'created_at': tweet.created_at,
-                    'author_name': author.name if author else 'Unknown',
-                    'author_username': author.username if author else 'unknown',
-                    'url': f"https://twitter.com/{author.username}/status/{tweet.id}" if author else None,
-                    'likes': tweet.public_metrics['like_count'] if tweet.public_metrics else 0,
-                    'retweets': tweet.public_metrics['retweet_count'] if tweet.public_metrics else 0
-                })
+                results.append(Tweet(
+                    id=int(tweet.id),
+                    text=tweet.text,
+                    text_lower=tweet.text.lower(),
+                    created_at=tweet.created_at,
+                    author_name=author.name if author else 'Unknown',
+                    author_username=author.username if author else 'unknown',
+                    url=f"https://twitter.com/{author.username}/status/{tweet.id}" if author else None,
+                    likes=tweet.public_metrics['like_count'] if tweet.public_metrics else 0,
+                    retweets=tweet.public_metrics['retweet_count'] if tweet.public_metrics else 0
+                ))
             
             return results
         
@@ -110,137 +278,160 @@ class TwitterJobBot:
             print(f"Error searching tweets: {e}")
             return []
     
-    def filter_relevant_jobs(self, tweets: List[Dict], filters: Dict) -> List[Dict]:
+    def filter_relevant_jobs(self, tweets: List[Tweet], filters: Optional[Dict] = None) -> List[Tweet]:
         """
         Filter tweets to only include relevant job postings
 
         Args:
-            tweets: List of tweet dictionaries
-            filters: Dictionary with 'include' and 'exclude' keyword lists
+            tweets: List of tweets
+            filters: Optional dictionary with 'include' and 'exclude' keyword lists;
+                defaults to the filters set on the bot
 
         Returns:
             Filtered list of tweets
         """
         relevant = []
 
-        include_keywords = [k.lower() for k in filters.get('include', [])]
-        exclude_keywords = [k.lower() for k in filters.get('exclude', [])]
-
-        # Nigeria-specific keywords that MUST be present
-        nigeria_keywords = [
-            'nigeria', 'nigerian', 'lagos', 'abuja', 'port harcourt',
-            'ibadan', 'kano', 'benin city', 'enugu', 'kaduna'
-        ]
+        if filters is not None:
+            self.set_filters(filters)
 
         for tweet in tweets:
-            text_lower = tweet['text'].lower()
+            # Skip anything already posted before scanning its text
+            if tweet.id in self.posted_jobs:
+                continue
 
-            # MUST contain at least one Nigeria-related keyword
-            has_nigeria = any(keyword in text_lower for keyword in nigeria_keywords)
+            text_lower = tweet.text_lower
 
-            # Check if tweet contains any exclude keywords
-            has_exclude = any(keyword in text_lower for keyword in exclude_keywords)
+            # Skip tweets that contain any exclude keywords
+            if self._exclude_pattern is not None and self._exclude_pattern.search(text_lower):
+                continue
+
+            # MUST contain at least one Nigeria-related keyword
+            if not NIGERIA_PATTERN.search(text_lower):
+                continue
 
             # Check if tweet contains any include keywords (optional for additional filtering)
-            has_include = any(keyword in text_lower for keyword in include_keywords) if include_keywords else True
+            if self._include_pattern is not None and not self._include_pattern.search(text_lower):
+                continue
 
-            # Only include if mentions Nigeria AND doesn't have excluded terms
-            if has_nigeria and not has_exclude and has_include:
-                relevant.append(tweet)
+            relevant.append(tweet)
 
         return relevant
     
-    def post_to_slack(self, tweet: Dict) -> bool:
+    async def post_to_slack(self, tweets: List[Tweet], semaphore: asyncio.Semaphore) -> List[Tweet]:
         """
-        Post a job to Slack
+        Post a batch of jobs to Slack as a single message
 
         Args:
-            tweet: Tweet dictionary
+            tweets: Tweets to post, at most SLACK_BATCH_SIZE
+            semaphore: Semaphore bounding the number of in-flight posts
 
         Returns:
-            True if successful, False otherwise
+            Tweets that were posted; empty if the post failed
         """
-        # Format the Slack message - simple text with Twitter URL
-        message = {
-            "blocks": [
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"{tweet['text']}\n\n{tweet['url']}"
-                    }
-                },
-                {
-                    "type": "divider"
-                }
-            ]
-        }
-        
         try:
-            response = requests.post(
-                self.slack_webhook,
-                json=message,
-                headers={'Content-Type': 'application/json'}
-            )
+            # Format the Slack message - simple text with Twitter URL for each job,
+            # dropping any tweet that can't be rendered instead of the whole batch
+            blocks = []
+            posted = []
+            for tweet in tweets:
+                try:
+                    blocks.append(_build_blocks(tweet))
+                    posted.append(tweet)
+                except Exception as e:
+                    print(f"❌ Skipping job {tweet.id}: could not format Slack message: {e}")
+            
+            if not posted:
+                return []
+            
+            body = '{"blocks": [' + ', '.join(blocks) + ']}'
             
-            if response.status_code == 200:
-                print(f"✅ Posted job {tweet['id']} to Slack")
-                return True
-            else:
-                print(f"❌ Failed to post to Slack: {response.status_code} - {response.text}")
-                return False
+            async with semaphore:
+                await self.slack_limiter.wait()
+                async with self.http.post(self.slack_webhook, data=body.encode('utf-8')) as response:
+                    if response.status == 200:
+                        print(f"✅ Posted jobs {', '.join(str(tweet.id) for tweet in posted)} to Slack")
+                        return posted
+                    else:
+                        print(f"❌ Failed to post to Slack: {response.status} - {await response.text()}")
+                        return []
         
         except Exception as e:
             print(f"❌ Error posting to Slack: {e}")
-            return False
+            return []
     
-    def run(self, search_keywords: List[str], filter_config: Dict, max_results: int = 20):
+    async def close(self):
+        """Release the Slack HTTP session and the posted jobs log"""
+        if self.http is not None:
+            await self.http.close()
+            self.http = None
+        if self._posted_fp is not None:
+            self._posted_fp.close()
+            self._posted_fp = None
+    
+    async def run(self, search_keywords: List[str], filter_config: Optional[Dict] = None, max_results: int = 20):
         """
         Main execution method
         
         Args:
             search_keywords: Keywords to search for on Twitter
-            filter_config: Filter configuration with 'include' and 'exclude' lists
+            filter_config: Optional filter configuration with 'include' and 'exclude' lists;
+                defaults to the filters set on the bot
             max_results: Maximum number of tweets to fetch
         """
         print(f"\n{'='*60}")
         print(f"Twitter Job Bot - Running at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*60}\n")
         
-        # Search for jobs
-        print(f"🔍 Searching for: {', '.join(search_keywords)}")
-        tweets = self.search_jobs(search_keywords, max_results)
-        print(f"📊 Found {len(tweets)} total tweets")
-        
-        if not tweets:
-            print("No new tweets found. Exiting.")
-            return
-        
-        # Filter relevant jobs
-        print(f"🔎 Applying filters...")
-        relevant_tweets = self.filter_relevant_jobs(tweets, filter_config)
-        print(f"✅ {len(relevant_tweets)} relevant jobs after filtering")
-        
-        # Post to Slack
-        posted_count = 0
-        for tweet in relevant_tweets:
-            if self.post_to_slack(tweet):
-                self.posted_jobs.add(tweet['id'])
-                posted_count += 1
-                time.sleep(1)  # Rate limiting
-        
-        # Save posted jobs
-        self._save_posted_jobs()
+        try:
+            # Search for jobs
+            print(f"🔍 Searching for: {', '.join(search_keywords)}")
+            tweets = await self.search_jobs(search_keywords, max_results)
+            print(f"📊 Found {len(tweets)} total tweets")
+            
+            if not tweets:
+                print("No new tweets found. Exiting.")
+                return
+            
+            # Filter relevant jobs
+            print(f"🔎 Applying filters...")
+            relevant_tweets = self.filter_relevant_jobs(tweets, filter_config)
+            print(f"✅ {len(relevant_tweets)} relevant jobs after filtering")
+            
+            # Post batches to Slack concurrently; the rate limiter keeps us within Slack's limits
+            self.http = aiohttp.ClientSession(
+                headers=SLACK_HEADERS,
+                connector=aiohttp.TCPConnector(limit=SLACK_MAX_CONCURRENCY)
+            )
+            self._posted_fp = open(self.posted_jobs_file, 'a')
+            semaphore = asyncio.Semaphore(SLACK_MAX_CONCURRENCY)
+            batches = [
+                relevant_tweets[i:i + SLACK_BATCH_SIZE]
+                for i in range(0, len(relevant_tweets), SLACK_BATCH_SIZE)
+            ]
+            results = await asyncio.gather(
+                *[self.post_to_slack(batch, semaphore) for batch in batches],
+                return_exceptions=True
+            )
+            
+            posted_count = 0
+            for batch, result in zip(batches, results):
+                if isinstance(result, BaseException):
+                    print(f"❌ Error posting jobs {', '.join(str(tweet.id) for tweet in batch)} to Slack: {result!r}")
+                    continue
+                if result:
+                    self._record_posted_jobs(tweet.id for tweet in result)
+                    posted_count += len(result)
+            
+            print(f"\n✨ Summary: Posted {posted_count} new jobs to Slack")
+            print(f"{'='*60}\n")
         
-        print(f"\n✨ Summary: Posted {posted_count} new jobs to Slack")
-        print(f"{'='*60}\n")
+        finally:
+            await self.close()
 
 
 def main():
     """Main entry point"""
-    # Initialize bot
-    bot = TwitterJobBot()
-
     # Configure search keywords (hashtags and terms) covering all career pathways
     # Note: Twitter API has a 512 character limit for search queries
     # Using most popular and broad hashtags to capture maximum jobs
@@ -342,12 +533,14 @@ def main():
         ]
     }
 
+    # Initialize bot
+    bot = TwitterJobBot(filter_config=filter_config)
+
     # Run the bot
-    bot.run(
+    asyncio.run(bot.run(
         search_keywords=search_keywords,
-        filter_config=filter_config,
         max_results=100  # Increased to fetch more tweets covering all pathways
-    )
+    ))
 
 
 if __name__ == '__main__':